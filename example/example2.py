@@ -6,9 +6,13 @@
 
 # Here we define all experiments, get data and then close the connection
 
+import logging
 import admiral
 from admiral import AdmiralSquidstatWrapper
 
+# Show the progress messages from the wrapper
+logging.basicConfig(level=logging.INFO)
+
 # Initialize the potentiostat
 measurement = AdmiralSquidstatWrapper(port="COM5", instrument_name="Plus1894")
 
@@ -3,8 +3,11 @@
 # Author: Nis Fisker-Bødker
 # Date: 18-06-2024
 
+from PySide2.QtCore import QEventLoop, QMetaObject, QObject, QThread, QTimer, Qt, Slot
 from PySide2.QtWidgets import QApplication
 from SquidstatPyLibrary import (
+    AisACData,
+    AisDCData,
     AisDeviceTracker,
     AisExperiment,
     AisEISPotentiostaticElement,
@@ -21,173 +24,283 @@ from SquidstatPyLibrary import (
     AisEISGalvanostaticElement,
     AisOpenCircuitElement,
 )
-import pandas as pd
-import time
-import warnings
+from collections import deque
+import logging
+import operator
+import os
+import threading
+
+from admiral_buffers import HAS_PYARROW, ParquetSink, SampleBuffer, next_run_index
+
+log = logging.getLogger(__name__)
+
+
+_AC_COLS = (
+    "Timestamp",
+    "Frequency [Hz]",
+    "Absolute Impedance",
+    "Phase Angle",
+    "Real Impedance",
+    "Imaginary Impedance",
+    "Total Harmonic Distortion",
+    "Number of Cycles",
+    "Working electrode DC Voltage [V]",
+    "DC Current [A]",
+    "Current Amplitude",
+    "Voltage Amplitude",
+)
+_DC_COLS = (
+    "Timestamp",
+    "Working Electrode Voltage [V]",
+    "Working Electrode Current [A]",
+    "Temperature [C]",
+)
+_ELEM_COLS = ("Step Name", "Step Number", "Substep Number")
+
+# Read all fields of a sample in one call, in the same order as the columns above
+_ac_fields = operator.attrgetter(
+    "timestamp",
+    "frequency",
+    "absoluteImpedance",
+    "phaseAngle",
+    "realImpedance",
+    "imagImpedance",
+    "totalHarmonicDistortion",
+    "numberOfCycles",
+    "workingElectrodeDCVoltage",
+    "DCCurrent",
+    "currentAmplitude",
+    "voltageAmplitude",
+)
+_dc_fields = operator.attrgetter(
+    "timestamp", "workingElectrodeVoltage", "current", "temperature"
+)
+
+# How often queued samples are moved into the sample buffers
+_DRAIN_INTERVAL_MS = 50
+
+
+class _SampleReceiver(QObject):
+    """Receives the AC/DC data signals on the thread it is moved to and queues the raw
+    samples for the drain timer. The library's instrument handler stays on the main thread.
+    """
+
+    def __init__(self, ac_queue, dc_queue):
+        super().__init__()
+        self.ac_queue = ac_queue
+        self.dc_queue = dc_queue
+
+    @Slot(int, AisACData)
+    def handle_ac_data(self, channel, data):
+        self.ac_queue.append(_ac_fields(data))
 
-# Suppress FutureWarning messages from Pandas
-warnings.simplefilter(action='ignore', category=FutureWarning)
+    @Slot(int, AisDCData)
+    def handle_dc_data(self, channel, data):
+        self.dc_queue.append(_dc_fields(data))
+
+    @Slot()
+    def sync(self):
+        """Does nothing, a blocking queued call to it returns once all samples queued
+        to this object before the call have been handled."""
 
 
 class AdmiralSquidstatWrapper:
-    def __init__(self, port="COM5", instrument_name="Plus1894"):
+    # __weakref__ is kept so bound methods can still be connected to Qt signals
+    __slots__ = (
+        "app",
+        "tracker",
+        "handler",
+        "channel",
+        "_loop",
+        "_max_samples",
+        "_output_dir",
+        "_run_index",
+        "_pending",
+        "_pending_count",
+        "_pending_ac",
+        "_ac_buf",
+        "_dc_buf",
+        "_elem_rows",
+        "_ac_queue",
+        "_dc_queue",
+        "_lock",
+        "_worker",
+        "_receiver",
+        "_closed",
+        "_connected",
+        "_drain_timer",
+        "__weakref__",
+    )
+
+    def __init__(
+        self, port="COM5", instrument_name="Plus1894", max_samples=None, output_dir=None
+    ):
         """Initialize the AdmiralWrapper class. This class is used to interface with the Admiral potentiostat.
 
         Args:
             port (str, optional): The COM port to which the potentiostat is connected. Defaults to "COM5".
             instrument_name (str, optional): The name of the instrument. Defaults to "Plus1894".
+            max_samples (int, optional): The maximum number of AC and DC samples to keep in memory each.
+                When reached, the oldest samples are overwritten. Defaults to None (unlimited).
+            output_dir (str, optional): Directory to stream the AC and DC samples to as Parquet files
+                instead of keeping them in memory, max_samples is then ignored. Every get_data()
+                closes the current file, so each call during a run leaves another part file, e.g.
+                run000_dc-000.parquet, run000_dc-001.parquet. Every clear_data() starts a new run
+                and leaves the files of the previous run on disk. Runs already in the directory are
+                never overwritten, numbering continues after them. Requires pyarrow. Defaults to None.
         """
 
+        if max_samples is not None and (
+            isinstance(max_samples, bool)
+            or not isinstance(max_samples, int)
+            or max_samples <= 0
+        ):
+            raise ValueError(
+                f"max_samples must be None or a positive integer, got {max_samples!r}"
+            )
+        if output_dir is not None:
+            if not HAS_PYARROW:
+                raise ImportError(
+                    "Streaming to Parquet requires pyarrow, install it with pip install admiral[parquet]"
+                )
+            os.makedirs(output_dir, exist_ok=True)
+
         self.app = QApplication()
         self.tracker = AisDeviceTracker.Instance()
         self.handler = None
         self.channel = 0
+        self._loop = None
+        self._max_samples = max_samples
+        self._output_dir = output_dir
+        # Continue after the runs already in output_dir instead of overwriting them
+        self._run_index = 0 if output_dir is None else next_run_index(output_dir)
+
+        # Elements added by the setup_* methods, uploaded together by run_experiment()
+        self._pending = AisExperiment()
+        self._pending_count = 0
+        self._pending_ac = False
+
+        # Incoming samples are written into preallocated arrays and only turned
+        # into DataFrames in get_data(), concatenating per sample is quadratic.
+        self._new_buffers()
+        self._elem_rows = []
+
+        # The receiver's slots only queue raw rows, the timer moves them into
+        # the buffers in batches. Both live on a worker thread so data ingest
+        # does not compete with the main event loop, the lock guards the buffers.
+        self._ac_queue = deque()
+        self._dc_queue = deque()
+        self._lock = threading.Lock()
+        self._worker = QThread()
+        self._closed = False
+        self._receiver = _SampleReceiver(self._ac_queue, self._dc_queue)
+        self._drain_timer = QTimer(self._receiver)
+        self._drain_timer.setInterval(_DRAIN_INTERVAL_MS)
+        self._drain_timer.timeout.connect(self._drain, type=Qt.DirectConnection)
+        self._receiver.moveToThread(self._worker)
+        self._worker.started.connect(self._drain_timer.start)
+        # finished is emitted on the worker thread itself, so the timer is stopped and the
+        # receiver deleted on the thread they belong to, before it exits
+        self._worker.finished.connect(self._drain_timer.stop)
+        self._worker.finished.connect(self._receiver.deleteLater)
+
+        # Data signals currently connected, only those the pending experiment needs
+        self._connected = set()
 
-        self.ac_data_list = pd.DataFrame(
-            columns=[
-                "Timestamp",
-                "Frequency [Hz]",
-                "Absolute Impedance",
-                "Phase Angle",
-                "Real Impedance",
-                "Imaginary Impedance",
-                "Total Harmonic Distortion",
-                "Number of Cycles",
-                "Working electrode DC Voltage [V]",
-                "DC Current [A]",
-                "Current Amplitude",
-                "Voltage Amplitude",
-            ]
-        )
-        self.dc_data_list = pd.DataFrame(
-            columns=[
-                "Timestamp",
-                "Working Electrode Voltage [V]",
-                "Working Electrode Current [A]",
-                "Temperature [C]",
-            ]
-        )
-        self.new_element_list = pd.DataFrame(
-            columns=["Step Name", "Step Number", "Substep Number"]
-        )
         self.connect_to_device(port=port, instrument_name=instrument_name)
         self.setup_data_handlers()
+        self._worker.start()
 
     def __del__(self):
-        """Close the experiment on the potentiostat and release the Qt application. Remember to call get_data() before calling this function to retrieve the data."""
+        """Shut down the wrapper if close_experiment() or shutdown() was not called."""
+        if not getattr(self, "_closed", True):
+            self.shutdown()
+
+    def shutdown(self):
+        """Stop the data worker thread and release the Qt application. Safe to call more than once.
+        Remember to call get_data() before calling this function to retrieve the data.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._drop_data_handlers()
+        self._worker.quit()
+        self._worker.wait()
+        if self._output_dir is not None:
+            self._drain()
+            with self._lock:
+                self._ac_buf.close()
+                self._dc_buf.close()
         self.app.quit()
-        time.sleep(1)
 
     def get_data(self):
         """Return the AC and DC data as pandas dataframes. If no data is available, return None for the respective dataframe.
-        
+
         Returns:
             [pd.DataFrame, pd.DataFrame]: A list containing the two AC data and the DC data pandas dataframes.
         """
-        print("Returning data")
-        if self.ac_data_list.empty is True:
-            print("No AC data available \n")
-            return None, self.dc_data_list
-        elif self.dc_data_list.empty is True:
-            print("No DC data available \n")
-            return self.ac_data_list, None
-        else:
-            print("")
-            return self.ac_data_list, self.dc_data_list
+        log.debug("Returning data")
+        self._drain()
+        with self._lock:
+            ac_data = self._ac_buf.to_frame() if len(self._ac_buf) else None
+            dc_data = self._dc_buf.to_frame() if len(self._dc_buf) else None
+        if ac_data is None:
+            log.info("No AC data available")
+        if dc_data is None:
+            log.info("No DC data available")
+        return ac_data, dc_data
 
     def clear_data(self):
-        """Clear the AC and DC data dataframes."""
-        self.ac_data_list = pd.DataFrame(
-            columns=[
-                "Timestamp",
-                "Frequency [Hz]",
-                "Absolute Impedance",
-                "Phase Angle",
-                "Real Impedance",
-                "Imaginary Impedance",
-                "Total Harmonic Distortion",
-                "Number of Cycles",
-                "Working electrode DC Voltage [V]",
-                "DC Current [A]",
-                "Current Amplitude",
-                "Voltage Amplitude",
-            ]
-        )
-        self.dc_data_list = pd.DataFrame(
-            columns=[
-                "Timestamp",
-                "Working Electrode Voltage [V]",
-                "Working Electrode Current [A]",
-                "Temperature [C]",
-            ]
-        )
-        # self.new_element_list = pd.DataFrame(
-        #     columns=["Step Name", "Step Number", "Substep Number"]
-        # )
-        time.sleep(1)
-
-    def handle_dc_data(self, channel, data):
-        if data.timestamp is not None:
-            self.dc_data_list = pd.concat(
-                [
-                    self.dc_data_list,
-                    pd.DataFrame(
-                        {
-                            "Timestamp": [data.timestamp],
-                            "Working Electrode Voltage [V]": [data.workingElectrodeVoltage],
-                            "Working Electrode Current [A]": [data.current],
-                            "Temperature [C]": [data.temperature],
-                        }
-                    ),
-                ]
-            )
-
-    def handle_ac_data(self, channel, data):
-        if data.timestamp is not None:
-            self.ac_data_list = pd.concat(
-                [
-                    self.ac_data_list,
-                    pd.DataFrame(
-                        {
-                            "Timestamp": [data.timestamp],
-                            "Frequency [Hz]": [data.frequency],
-                            "Absolute Impedance": [data.absoluteImpedance],
-                            "Phase Angle": [data.phaseAngle],
-                            "Real Impedance": [data.realImpedance],
-                            "Imaginary Impedance": [data.imagImpedance],
-                            "Total Harmonic Distortion": [data.totalHarmonicDistortion],
-                            "Number of Cycles": [data.numberOfCycles],
-                            "Working electrode DC Voltage [V]": [
-                                data.workingElectrodeDCVoltage
-                            ],
-                            "DC Current [A]": [data.DCCurrent],
-                            "Current Amplitude": [data.currentAmplitude],
-                            "Voltage Amplitude": [data.voltageAmplitude],
-                        }
-                    ),
-                ]
-            )
+        """Clear the AC and DC data."""
+        with self._lock:
+            self._ac_queue.clear()
+            self._dc_queue.clear()
+            if self._output_dir is not None:
+                self._ac_buf.close()
+                self._dc_buf.close()
+                self._run_index += 1
+            self._new_buffers()
+        # self._elem_rows = []
+
+    def _new_buffers(self):
+        if self._output_dir is None:
+            self._ac_buf = SampleBuffer(_AC_COLS, max_samples=self._max_samples)
+            self._dc_buf = SampleBuffer(_DC_COLS, max_samples=self._max_samples)
+        else:
+            prefix = os.path.join(self._output_dir, f"run{self._run_index:03d}")
+            self._ac_buf = ParquetSink(_AC_COLS, prefix + "_ac")
+            self._dc_buf = ParquetSink(_DC_COLS, prefix + "_dc")
+
+    def _drain(self):
+        with self._lock:
+            for queue, buffer in (
+                (self._ac_queue, self._ac_buf),
+                (self._dc_queue, self._dc_buf),
+            ):
+                # Only take what is queued now, the handlers may keep appending
+                rows = [queue.popleft() for _ in range(len(queue))]
+                if rows:
+                    buffer.extend(rows)
 
     def handle_new_element(self, channel, data):
-        self.new_element_list = pd.concat(
-            [
-                self.new_element_list,
-                pd.DataFrame(
-                    {
-                        "Step Name": [data.stepName],
-                        "Step Number": [data.stepNumber],
-                        "Substep Number": [data.substepNumber],
-                    }
-                ),
-            ]
+        self._elem_rows.append(
+            {
+                "Step Name": data.stepName,
+                "Step Number": data.stepNumber,
+                "Substep Number": data.substepNumber,
+            }
         )
 
     def on_device_connected(self, device_name):
-        print(f"Device is connected as: {device_name} \nPlease use this name when loading the AdmiralWrapper.")
+        log.info(
+            "Device is connected as: %s. Please use this name when loading the AdmiralWrapper.",
+            device_name,
+        )
 
     def handle_experiment_stopped(self, channel):
-        print("Experiment completed on channel: %d" % channel)
-        self.app.quit()
+        log.info("Experiment completed on channel: %d", channel)
+        if self._loop is not None:
+            QTimer.singleShot(0, self._loop.quit)
 
     def connect_to_device(self, port, instrument_name="Plus1894"):
         self.tracker.newDeviceConnected.connect(self.on_device_connected)
@@ -195,38 +308,91 @@ class AdmiralSquidstatWrapper:
         self.handler = self.tracker.getInstrumentHandler(instrument_name)
 
     def setup_data_handlers(self):
-        self.handler.activeDCDataReady.connect(self.handle_dc_data)
-        self.handler.activeACDataReady.connect(self.handle_ac_data)
+        # The AC/DC data signals are connected per run, see run_experiment()
         self.handler.experimentNewElementStarting.connect(self.handle_new_element)
         self.handler.experimentStopped.connect(self.handle_experiment_stopped)
 
+    def _ensure(self, sig_name, slot):
+        """Internal function, connects the data signal to the slot unless it already is"""
+        if sig_name not in self._connected:
+            getattr(self.handler, sig_name).connect(slot, type=Qt.QueuedConnection)
+            self._connected.add(sig_name)
+
+    def _drop(self, sig_name, slot):
+        """Internal function, disconnects the data signal from the slot if it is connected"""
+        if sig_name in self._connected:
+            getattr(self.handler, sig_name).disconnect(slot)
+            self._connected.discard(sig_name)
+
+    def _drop_data_handlers(self):
+        """Internal function, disconnects both data signals, run_experiment connects what it needs"""
+        self._drop("activeACDataReady", self._receiver.handle_ac_data)
+        self._drop("activeDCDataReady", self._receiver.handle_dc_data)
+
     def upload_experiment(self, experiment):
-        """Internal function, to be run after the element (measurement) has been appended to the experiment"""
-        print("Uploading experiment")
+        """Internal function, to be run after the element (measurement) has been appended to the experiment.
+        Returns the error code from the instrument, which compares equal to 0 on success.
+        """
+        log.debug("Uploading experiment")
         error = self.handler.uploadExperimentToChannel(self.channel, experiment)
         if error != 0:
-            print(error.message())
+            log.error(error.message())
+        return error
 
     def start_experiment(self):
-        """Internal function, to be run after upload_experiment"""
-        print("Setting potentiostat in start experiment modus")
+        """Internal function, to be run after upload_experiment.
+        Returns the error code from the instrument, which compares equal to 0 on success.
+        """
+        log.debug("Setting potentiostat in start experiment modus")
         error = self.handler.startUploadedExperiment(self.channel)
         if error != 0:
-            print(error.message())
+            log.error(error.message())
+        return error
 
     def run_experiment(self):
         """Run an experiment on the potentiostat. Remember to define the experiment first,
-        for instance using setup_potentiostaticEIS() or setup_CV().
+        for instance using setup_potentiostaticEIS() or setup_CV(). All experiments set up
+        since the last run are uploaded together and run back to back. If the upload or
+        start fails, the error is logged, nothing is run and the experiments stay queued.
 
         """
-        self.app.exec_()
+        if self._pending_count == 0:
+            log.warning("No experiment has been set up")
+            return
+        # A local event loop per experiment keeps the QApplication alive between runs.
+        # It is created before starting so an early experimentStopped is not lost.
+        self._loop = QEventLoop()
+        # Only connect the data signals the queued experiments produce
+        self._ensure("activeDCDataReady", self._receiver.handle_dc_data)
+        if self._pending_ac:
+            self._ensure("activeACDataReady", self._receiver.handle_ac_data)
+        if self.upload_experiment(self._pending) != 0 or self.start_experiment() != 0:
+            self._loop = None
+            self._drop_data_handlers()
+            return
+        self._pending = AisExperiment()
+        self._pending_count = 0
+        self._pending_ac = False
+        self._loop.exec_()
+        self._loop = None
+        # Wait until the worker has handled the samples emitted before the experiment stopped
+        QMetaObject.invokeMethod(self._receiver, "sync", Qt.BlockingQueuedConnection)
+        self._drop_data_handlers()
+
+    def _append_element(self, element, repeats=1, ac=False):
+        """Internal function, adds the element to the experiment uploaded by run_experiment.
+        Only EIS elements (ac=True) produce AC data, run_experiment connects the AC handler
+        only if one of them is queued."""
+        self._pending_ac = self._pending_ac or ac
+        self._pending.appendElement(element, repeats)
+        self._pending_count += 1
 
     def close_experiment(self):
         """Close the experiment on the potentiostat and release the Qt application.
         Remember to call get_data() before calling this function to retrieve the data.
 
         """
-        self.__del__()
+        self.shutdown()
 
     def setup_EIS_potentiostatic(
         self,
@@ -237,7 +403,7 @@ class AdmiralSquidstatWrapper:
         voltage_amplitude: float = 0.1,
         number_of_runs: int = 1,
     ):
-        """Perform an potentiostatic EIS experiment on the potentiostat
+        """Queue a potentiostatic EIS experiment, it is performed on the potentiostat by run_experiment()
 
         Args:
             start_frequency (float): The start frequency of the EIS experiment
@@ -247,8 +413,7 @@ class AdmiralSquidstatWrapper:
             voltage_amplitude (float): The amplitude of the voltage signal
         """
 
-        print("\n*** Preparing EIS experiment")
-        experiment = AisExperiment()
+        log.info("Preparing EIS experiment")
         element = AisEISPotentiostaticElement(
             start_frequency,
             end_frequency,
@@ -256,9 +421,7 @@ class AdmiralSquidstatWrapper:
             voltage_bias,
             voltage_amplitude,
         )
-        experiment.appendElement(element, number_of_runs)
-        self.upload_experiment(experiment)
-        self.start_experiment()
+        self._append_element(element, number_of_runs, ac=True)
 
     def setup_cyclic_voltammetry(
         self,
@@ -270,7 +433,7 @@ class AdmiralSquidstatWrapper:
         samplingInterval: float = 0.01,
         cycles=1,
     ):
-        """Perform a cyclic voltammetry experiment on the potentiostat
+        """Queue a cyclic voltammetry experiment, it is performed on the potentiostat by run_experiment()
 
         Args:
             startVoltage (float): The start potential of the cyclic
@@ -287,8 +450,7 @@ class AdmiralSquidstatWrapper:
             cycles (int): The number of cycles to perform
         """
 
-        print("\n*** Preparing CV experiment")
-        experiment = AisExperiment()
+        log.info("Preparing CV experiment")
         element = AisCyclicVoltammetryElement(
             startVoltage,
             firstVoltageLimit,
@@ -297,9 +459,7 @@ class AdmiralSquidstatWrapper:
             scanRate,
             samplingInterval,
         )
-        experiment.appendElement(element, cycles)
-        self.upload_experiment(experiment)
-        self.start_experiment()
+        self._append_element(element, cycles)
 
     def setup_constant_current(
         self,
@@ -307,7 +467,7 @@ class AdmiralSquidstatWrapper:
         samplingInterval: float = 0.01,
         duration: float = 10,
     ):
-        """Perform a constant current experiment on the potentiostat
+        """Queue a constant current experiment, it is performed on the potentiostat by run_experiment()
 
         Args:
             holdAtCurrent (float): The current to hold at in A
@@ -315,12 +475,9 @@ class AdmiralSquidstatWrapper:
             duration (float): The duration of the experiment in seconds
         """
 
-        print("\n*** Preparing CP experiment")
-        experiment = AisExperiment()
+        log.info("Preparing CP experiment")
         element = AisConstantCurrentElement(holdAtCurrent, samplingInterval, duration)
-        experiment.appendElement(element)
-        self.upload_experiment(experiment)
-        self.start_experiment()
+        self._append_element(element)
 
     def setup_constant_potential(
         self,
@@ -328,7 +485,7 @@ class AdmiralSquidstatWrapper:
         samplingInterval: float = 0.01,
         duration: float = 10,
     ):
-        """Perform a constant potential experiment on the potentiostat
+        """Queue a constant potential experiment, it is performed on the potentiostat by run_experiment()
 
         Args:
             holdAtVoltage (float): The voltage to hold at in V
@@ -336,12 +493,9 @@ class AdmiralSquidstatWrapper:
             duration (float): The duration of the experiment in seconds
         """
 
-        print("\n*** Preparing CP experiment")
-        experiment = AisExperiment()
+        log.info("Preparing CP experiment")
         element = AisConstantPotElement(holdAtVoltage, samplingInterval, duration)
-        experiment.appendElement(element)
-        self.upload_experiment(experiment)
-        self.start_experiment()
+        self._append_element(element)
 
     def setup_constant_power(
         self,
@@ -350,7 +504,7 @@ class AdmiralSquidstatWrapper:
         duration: float = 10,
         samplingInterval: float = 0.01,
     ):
-        """Perform a constant power experiment on the potentiostat
+        """Queue a constant power experiment, it is performed on the potentiostat by run_experiment()
 
         Args:
             isCharge (bool): Whether the power is positive or negative
@@ -359,14 +513,11 @@ class AdmiralSquidstatWrapper:
             samplingInterval (float): The sampling interval in seconds
         """
 
-        print("\n*** Preparing CP experiment")
-        experiment = AisExperiment()
+        log.info("Preparing CP experiment")
         element = AisConstantPowerElement(
             isCharge, powerVal, duration, samplingInterval
         )
-        experiment.appendElement(element)
-        self.upload_experiment(experiment)
-        self.start_experiment()
+        self._append_element(element)
 
     def setup_constant_resistance(
         self,
@@ -374,7 +525,7 @@ class AdmiralSquidstatWrapper:
         duration: float = 10,
         samplingInterval: float = 0.01,
     ):
-        """Perform a constant resistance experiment on the potentiostat
+        """Queue a constant resistance experiment, it is performed on the potentiostat by run_experiment()
 
         Args:
             resistanceVal (float): The resistance value in Ohm
@@ -382,14 +533,11 @@ class AdmiralSquidstatWrapper:
             samplingInterval (float): The sampling interval in seconds
         """
 
-        print("\n*** Preparing CP experiment")
-        experiment = AisExperiment()
+        log.info("Preparing CP experiment")
         element = AisConstantResistanceElement(
             resistanceVal, duration, samplingInterval
         )
-        experiment.appendElement(element)
-        self.upload_experiment(experiment)
-        self.start_experiment()
+        self._append_element(element)
 
     def setup_DC_current_sweep(
         self,
@@ -398,7 +546,7 @@ class AdmiralSquidstatWrapper:
         scanRate: float = 0.1,
         samplingInterval: float = 0.01,
     ):
-        """Perform a DC current sweep experiment on the potentiostat
+        """Queue a DC current sweep experiment, it is performed on the potentiostat by run_experiment()
 
         Args:
             startCurrent (float): The start current in A
@@ -407,14 +555,11 @@ class AdmiralSquidstatWrapper:
             samplingInterval (float): The sampling interval in seconds
         """
 
-        print("\n*** Preparing DC current sweep experiment")
-        experiment = AisExperiment()
+        log.info("Preparing DC current sweep experiment")
         element = AisDCCurrentSweepElement(
             startCurrent, endCurrent, scanRate, samplingInterval
         )
-        experiment.appendElement(element)
-        self.upload_experiment(experiment)
-        self.start_experiment()
+        self._append_element(element)
 
     def setup_DC_potential_sweep(
         self,
@@ -423,7 +568,7 @@ class AdmiralSquidstatWrapper:
         scanRate: float = 0.1,
         samplingInterval: float = 0.01,
     ):
-        """Perform a DC potential sweep experiment on the potentiostat
+        """Queue a DC potential sweep experiment, it is performed on the potentiostat by run_experiment()
 
         Args:
             startPotential (float): The start potential in V
@@ -432,14 +577,11 @@ class AdmiralSquidstatWrapper:
             samplingInterval (float): The sampling interval in seconds
         """
 
-        print("\n*** Preparing DC potential sweep experiment")
-        experiment = AisExperiment()
+        log.info("Preparing DC potential sweep experiment")
         element = AisDCPotentialSweepElement(
             startPotential, endPotential, scanRate, samplingInterval
         )
-        experiment.appendElement(element)
-        self.upload_experiment(experiment)
-        self.start_experiment()
+        self._append_element(element)
 
     def setup_diff_pulse_voltammetry(
         self,
@@ -450,7 +592,7 @@ class AdmiralSquidstatWrapper:
         pulseWidth: float = 0.02,
         pulsePeriod: float = 0.2,
     ):
-        """Perform a differential pulse voltammetry experiment on the potentiostat
+        """Queue a differential pulse voltammetry experiment, it is performed on the potentiostat by run_experiment()
 
         Args:
             startPotential (float): The start potential in V
@@ -461,8 +603,7 @@ class AdmiralSquidstatWrapper:
             pulsePeriod (float): The pulse period in s
         """
 
-        print("\n*** Preparing DPV experiment")
-        experiment = AisExperiment()
+        log.info("Preparing DPV experiment")
         element = AisDiffPulseVoltammetryElement(
             startPotential,
             endPotential,
@@ -471,9 +612,7 @@ class AdmiralSquidstatWrapper:
             pulseWidth,
             pulsePeriod,
         )
-        experiment.appendElement(element)
-        self.upload_experiment(experiment)
-        self.start_experiment()
+        self._append_element(element)
 
     def setup_normal_pulse_voltammetry(
         self,
@@ -483,7 +622,7 @@ class AdmiralSquidstatWrapper:
         pulseWidth: float = 0.02,
         pulsePeriod: float = 0.2,
     ):
-        """Perform a normal pulse voltammetry experiment on the potentiostat
+        """Queue a normal pulse voltammetry experiment, it is performed on the potentiostat by run_experiment()
 
         Args:
             startPotential (float): The start potential in V
@@ -493,8 +632,7 @@ class AdmiralSquidstatWrapper:
             pulsePeriod (float): The pulse period in s
         """
 
-        print("\n*** Preparing NPV experiment")
-        experiment = AisExperiment()
+        log.info("Preparing NPV experiment")
         element = AisNormalPulseVoltammetryElement(
             startPotential,
             endPotential,
@@ -502,9 +640,7 @@ class AdmiralSquidstatWrapper:
             pulseWidth,
             pulsePeriod,
         )
-        experiment.appendElement(element)
-        self.upload_experiment(experiment)
-        self.start_experiment()
+        self._append_element(element)
 
     def setup_square_wave(
         self,
@@ -516,7 +652,7 @@ class AdmiralSquidstatWrapper:
         samplingInterval: float = 0.01,
         cycles=1,
     ):
-        """Perform a square wave voltammetry experiment on the potentiostat
+        """Queue a square wave voltammetry experiment, it is performed on the potentiostat by run_experiment()
 
         Args:
             startPotential (float): The start potential in V
@@ -528,8 +664,7 @@ class AdmiralSquidstatWrapper:
             cycles (int): The number of cycles to perform
         """
 
-        print("\n*** Preparing SWV experiment")
-        experiment = AisExperiment()
+        log.info("Preparing SWV experiment")
         element = AisSquareWaveVoltammetryElement(
             startPotential,
             firstVoltageLimit,
@@ -538,9 +673,7 @@ class AdmiralSquidstatWrapper:
             scanRate,
             samplingInterval,
         )
-        experiment.appendElement(element, cycles)
-        self.upload_experiment(experiment)
-        self.start_experiment()
+        self._append_element(element, cycles)
 
     def setup_EIS_Galvanostatic(
         self,
@@ -551,7 +684,7 @@ class AdmiralSquidstatWrapper:
         current_amplitude: float = 0.1,
         number_of_runs: int = 1,
     ):
-        """Perform an galvanostatic EIS experiment on the potentiostat
+        """Queue a galvanostatic EIS experiment, it is performed on the potentiostat by run_experiment()
 
         Args:
             start_frequency (float): The start frequency of the EIS experiment
@@ -561,8 +694,7 @@ class AdmiralSquidstatWrapper:
             current_amplitude (float): The amplitude of the current signal
         """
 
-        print("\n*** Preparing EIS experiment")
-        experiment = AisExperiment()
+        log.info("Preparing EIS experiment")
         element = AisEISGalvanostaticElement(
             start_frequency,
             end_frequency,
@@ -570,20 +702,15 @@ class AdmiralSquidstatWrapper:
             current_bias,
             current_amplitude,
         )
-        experiment.appendElement(element, number_of_runs)
-        self.upload_experiment(experiment)
-        self.start_experiment()
+        self._append_element(element, number_of_runs, ac=True)
 
     def setup_OCP(self, duration: float = 10, samplingInterval: float = 0.01):
-        """Perform an open circuit potential experiment on the potentiostat
+        """Queue an open circuit potential experiment, it is performed on the potentiostat by run_experiment()
 
         Args:
             duration (float): The duration of the experiment in seconds
             samplingInterval (float): The sampling interval in seconds"""
 
-        print("\n*** Preparing OCP experiment")
-        experiment = AisExperiment()
+        log.info("Preparing OCP experiment")
         element = AisOpenCircuitElement(duration, samplingInterval)
-        experiment.appendElement(element)
-        self.upload_experiment(experiment)
-        self.start_experiment()
+        self._append_element(element)
@@ -0,0 +1,169 @@
+# Sample buffers used by the AdmiralSquidstatWrapper in admiral.py. They are kept apart from
+# the wrapper so they can be used and tested without Qt or the Squidstat library.
+
+import numpy as np
+import os
+import pandas as pd
+import re
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+HAS_PYARROW = pq is not None
+
+_RUN_FILE = re.compile(r"run(\d+)_(?:ac|dc)-\d+\.parquet")
+
+
+def next_run_index(output_dir):
+    """Return the first run index after the runs already stored in output_dir, so a new
+    session never reuses the file names of an earlier one."""
+    indices = [
+        int(match.group(1))
+        for match in map(_RUN_FILE.fullmatch, os.listdir(output_dir))
+        if match
+    ]
+    return max(indices, default=-1) + 1
+
+
+class SampleBuffer:
+    """Preallocated float64 columns that batches of samples are written into.
+    The columns grow by doubling when full, unless max_samples is given, in which case
+    they form a ring buffer that overwrites the oldest samples. The columns are only
+    wrapped in a DataFrame on request."""
+
+    __slots__ = ("columns", "max_samples", "n", "head", "buf")
+
+    def __init__(self, columns, capacity=1024, max_samples=None):
+        self.columns = columns
+        self.max_samples = max_samples
+        self.n = 0
+        self.head = 0
+        if max_samples is not None:
+            capacity = max_samples
+        self.buf = {col: np.empty(capacity, dtype=np.float64) for col in columns}
+
+    def __len__(self):
+        return self.n
+
+    def extend(self, rows):
+        block = np.array(rows, dtype=np.float64).reshape(-1, len(self.columns))
+        # Samples without a timestamp carry no data
+        block = block[~np.isnan(block[:, 0])]
+        if self.max_samples is None:
+            size = len(self.buf[self.columns[0]])
+            if self.head + len(block) > size:
+                while size < self.head + len(block):
+                    size *= 2
+                for col in self.columns:
+                    self.buf[col] = np.resize(self.buf[col], size)
+            for j, col in enumerate(self.columns):
+                self.buf[col][self.head : self.head + len(block)] = block[:, j]
+            self.head += len(block)
+            self.n = self.head
+            return
+
+        block = block[-self.max_samples :]
+        if self.head == self.max_samples:
+            self.head = 0
+        first = min(len(block), self.max_samples - self.head)
+        rest = len(block) - first
+        for j, col in enumerate(self.columns):
+            self.buf[col][self.head : self.head + first] = block[:first, j]
+            self.buf[col][:rest] = block[first:, j]
+        if rest:
+            self.head = rest
+            self.n = self.max_samples
+        else:
+            self.head += first
+            self.n = max(self.n, self.head)
+
+    def to_frame(self):
+        if self.max_samples is None:
+            return pd.DataFrame(
+                {col: self.buf[col][: self.n] for col in self.columns}, copy=False
+            )
+        # Ring buffer rows get overwritten, so hand out new arrays in chronological
+        # order. They are not shared with anything else and need no further copy.
+        return pd.DataFrame(
+            {
+                col: np.concatenate(
+                    (self.buf[col][self.head : self.n], self.buf[col][: self.head])
+                )
+                for col in self.columns
+            },
+            copy=False,
+        )
+
+
+class ParquetSink:
+    """Streams batches of samples to Parquet files instead of keeping them in memory.
+    Rows are staged until batch_rows are available and then written as one record batch.
+    A new part file is started after every read, since a Parquet file is only readable
+    once its writer is closed."""
+
+    __slots__ = (
+        "columns",
+        "prefix",
+        "batch_rows",
+        "schema",
+        "parts",
+        "writer",
+        "staged",
+        "n",
+    )
+
+    def __init__(self, columns, prefix, batch_rows=1024):
+        self.columns = columns
+        self.prefix = prefix
+        self.batch_rows = batch_rows
+        self.schema = pa.schema([(col, pa.float64()) for col in columns])
+        self.parts = []
+        self.writer = None
+        self.staged = SampleBuffer(columns, capacity=batch_rows)
+        self.n = 0
+
+    def __len__(self):
+        return self.n
+
+    def extend(self, rows):
+        before = len(self.staged)
+        self.staged.extend(rows)
+        self.n += len(self.staged) - before
+        if len(self.staged) >= self.batch_rows:
+            self.flush()
+
+    def flush(self):
+        if len(self.staged) == 0:
+            return
+        if self.writer is None:
+            path = f"{self.prefix}-{len(self.parts):03d}.parquet"
+            # ParquetWriter truncates existing files, never write over earlier data
+            if os.path.exists(path):
+                raise FileExistsError(f"Refusing to overwrite {path}")
+            self.writer = pq.ParquetWriter(path, self.schema)
+            self.parts.append(path)
+        batch = pa.RecordBatch.from_arrays(
+            [
+                pa.array(self.staged.buf[col][: len(self.staged)])
+                for col in self.columns
+            ],
+            schema=self.schema,
+        )
+        self.writer.write_batch(batch)
+        self.staged = SampleBuffer(self.columns, capacity=self.batch_rows)
+
+    def close(self):
+        self.flush()
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    def to_frame(self):
+        self.close()
+        return pa.concat_tables(
+            [pq.read_table(path, memory_map=True) for path in self.parts]
+        ).to_pandas()
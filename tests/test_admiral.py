@@ -0,0 +1,12 @@
+import pytest
+
+pytest.importorskip("PySide2")
+pytest.importorskip("SquidstatPyLibrary")
+
+from admiral import AdmiralSquidstatWrapper  # noqa: E402
+
+
+@pytest.mark.parametrize("max_samples", [0, -1, 2.5, True])
+def test_invalid_max_samples(max_samples):
+    with pytest.raises(ValueError):
+        AdmiralSquidstatWrapper(max_samples=max_samples)
@@ -0,0 +1,85 @@
+import random
+from collections import deque
+
+import pytest
+
+from admiral_buffers import ParquetSink, SampleBuffer, next_run_index
+
+COLUMNS = ("Timestamp", "Value")
+
+
+def test_ring_buffer_matches_deque():
+    rng = random.Random(0)
+    for _ in range(500):
+        max_samples = rng.randint(1, 8)
+        buffer = SampleBuffer(COLUMNS, max_samples=max_samples)
+        reference = deque(maxlen=max_samples)
+        timestamp = 0
+        for _ in range(rng.randint(1, 6)):
+            rows = []
+            for _ in range(rng.randint(1, 12)):
+                timestamp += 1
+                if rng.random() < 0.1:
+                    rows.append((None, 0.0))
+                    continue
+                rows.append((timestamp, float(-timestamp)))
+                reference.append(timestamp)
+            buffer.extend(rows)
+            frame = buffer.to_frame()
+            assert len(buffer) == len(reference)
+            assert frame["Timestamp"].tolist() == list(reference)
+            assert frame["Value"].tolist() == [-t for t in reference]
+
+
+def test_growing_buffer_keeps_returned_frames():
+    buffer = SampleBuffer(COLUMNS, capacity=2)
+    buffer.extend([(1, 1.0), (2, 2.0)])
+    first = buffer.to_frame()
+    buffer.extend([(3, 3.0), (4, 4.0), (5, 5.0)])
+    assert first["Timestamp"].tolist() == [1, 2]
+    assert buffer.to_frame()["Timestamp"].tolist() == [1, 2, 3, 4, 5]
+
+
+def test_parquet_sink_round_trip(tmp_path):
+    pytest.importorskip("pyarrow")
+
+    sink = ParquetSink(COLUMNS, str(tmp_path / "run000_dc"), batch_rows=1024)
+    sink.extend([(t, float(t)) for t in range(1500)] + [(None, 0.0)])
+    assert sink.to_frame()["Timestamp"].tolist() == list(range(1500))
+
+    # Writing after a read starts a new part file, reads cover all parts
+    sink.extend([(t, float(t)) for t in range(1500, 3000)])
+    frame = sink.to_frame()
+    assert len(sink) == 3000
+    assert frame["Timestamp"].tolist() == list(range(3000))
+    assert frame["Value"].tolist() == [float(t) for t in range(3000)]
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "run000_dc-000.parquet",
+        "run000_dc-001.parquet",
+    ]
+
+
+def test_parquet_sessions_do_not_overwrite(tmp_path):
+    pytest.importorskip("pyarrow")
+
+    # First session
+    index = next_run_index(str(tmp_path))
+    assert index == 0
+    first = ParquetSink(COLUMNS, str(tmp_path / f"run{index:03d}_dc"))
+    first.extend([(t, float(t)) for t in range(5)])
+    first.close()
+
+    # Second session on the same directory continues with the next run
+    index = next_run_index(str(tmp_path))
+    assert index == 1
+    second = ParquetSink(COLUMNS, str(tmp_path / f"run{index:03d}_dc"))
+    second.extend([(5, 5.0)])
+    assert second.to_frame()["Timestamp"].tolist() == [5]
+    assert first.to_frame()["Timestamp"].tolist() == list(range(5))
+
+    # A sink that would reuse an existing file name refuses instead of truncating it
+    clash = ParquetSink(COLUMNS, str(tmp_path / "run000_dc"))
+    clash.extend([(6, 6.0)])
+    with pytest.raises(FileExistsError):
+        clash.flush()
+    assert first.to_frame()["Timestamp"].tolist() == list(range(5))